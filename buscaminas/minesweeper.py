@@ -1,6 +1,52 @@
+import functools
 import itertools
 import random
 
+import numpy as np
+
+# Generador propio de la IA, para no compartir el estado global de `random`
+_rng = random.Random()
+
+
+def _swap_remove(items, index, cell):
+    """
+    Quita una celda de una lista con su diccionario celda -> posición,
+    intercambiándola con la última de la lista. No hace nada si no está.
+    """
+    k = index.pop(cell, None)
+    if k is None:
+        return
+    last = items.pop()
+    if k < len(items):
+        items[k] = last
+        index[last] = k
+
+
+@functools.lru_cache(maxsize=None)
+def _neighbor_table(height, width):
+    """
+    Devuelve, para cada celda en orden de filas, los pares
+    (celda vecina, posición en orden de filas) dentro del tablero.
+    """
+    return tuple(
+        tuple(((i, j), i * width + j)
+              for i in range(max(0, ci - 1), min(height, ci + 2))
+              for j in range(max(0, cj - 1), min(width, cj + 2))
+              if (i, j) != (ci, cj))
+        for ci in range(height) for cj in range(width)
+    )
+
+
+def _mask(cells, width):
+    """
+    Devuelve el bitset de un conjunto de celdas, con un bit por celda
+    de un tablero del ancho dado en orden de filas.
+    """
+    mask = 0
+    for i, j in cells:
+        mask |= 1 << (i * width + j)
+    return mask
+
 
 class Minesweeper():
     """
@@ -12,23 +58,28 @@ class Minesweeper():
         # Establece el ancho, alto y número de minas iniciales
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Inicializa un campo vacío sin minas
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = np.zeros((height, width), dtype=np.uint8)
+
+        # Añade minas aleatoriamente, eligiendo posiciones distintas sin reemplazo
+        idx = np.random.default_rng().choice(height * width, size=mines, replace=False)
+        self.board.flat[idx] = 1
+        self.mines = {(int(i), int(j)) for i, j in np.argwhere(self.board)}
+
+        # Precalcula el número de minas vecinas de cada celda sumando las
+        # 8 copias desplazadas del tablero rodeado por un borde de ceros
+        padded = np.pad(self.board, 1)
+        counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if di == 1 and dj == 1:
+                    continue
+                counts += padded[di:di + height, dj:dj + width]
 
-        # Añade minas aleatoriamente
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Se guarda como listas de enteros de Python: leer un elemento de un
+        # arreglo de NumPy crea un escalar nuevo en cada consulta
+        self._counts = counts.tolist()
 
         # Al principio, el jugador no ha encontrado ninguna mina
         self.mines_found = set()
@@ -41,7 +92,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -50,7 +101,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -58,30 +109,14 @@ class Minesweeper():
         dentro de una fila y columna de una celda dada,
         sin incluir la celda en sí.
         """
-
-        # Mantiene el conteo de minas cercanas
-        count = 0
-
-        # Itera sobre todas las celdas dentro de una fila y columna
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignora la celda en sí
-                if (i, j) == cell:
-                    continue
-
-                # Actualiza el conteo si la celda está dentro del tablero y es una mina
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        return self._counts[cell[0]][cell[1]]
 
     def won(self):
         """
         Verifica si todas las minas han sido marcadas.
+        Como mines_found solo contiene minas, basta comparar los tamaños.
         """
-        return self.mines_found == self.mines
+        return len(self.mines_found) == len(self.mines)
 
 
 class Sentence():
@@ -89,15 +124,40 @@ class Sentence():
     Declaración lógica sobre un juego de Buscaminas.
     Una sentencia consiste en un conjunto de celdas del tablero
     y un conteo del número de esas celdas que son minas.
+
+    `width` es el ancho del tablero, con el que se numeran las celdas en
+    el bitset `mask`; debe ser el mismo que el de la IA que usa la sentencia.
+    Si ya se conoce el bitset se puede pasar en `mask`.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, cells, count, width, mask=None):
+        # Un set recién creado se usa tal cual, sin copiarlo
+        self.cells = cells if type(cells) is set else set(cells)
         self.count = count
 
+        # Número de celdas, actualizado al marcar para no llamar a len()
+        self._size = len(self.cells)
+
+        # Bitset de las celdas, actualizado al marcar junto con self.cells
+        self._width = width
+        self.mask = _mask(self.cells, width) if mask is None else mask
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    @property
+    def size(self):
+        """
+        Número de celdas de la sentencia.
+        """
+        return self._size
+
+    def key(self):
+        """
+        Devuelve una clave inmutable que identifica el contenido de la sentencia.
+        """
+        return (frozenset(self.cells), self.count)
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
@@ -105,21 +165,13 @@ class Sentence():
         """
         Devuelve el conjunto de todas las celdas en self.cells que se sabe que son minas.
         """
-        if self.count==len(self.cells):
-            return self.cells
-        else:
-            return None
-        
+        return self.cells if self.count == self._size else None
 
     def known_safes(self):
         """
         Devuelve el conjunto de todas las celdas en self.cells que se sabe que son seguras.
         """
-        if self.count==0:
-            return self.cells
-        else: 
-            return None
-        
+        return self.cells if self.count == 0 and self._size else None
 
     def mark_mine(self, cell):
         """
@@ -129,6 +181,8 @@ class Sentence():
         if cell in self.cells:
             self.cells.remove(cell)
             self.count=self.count-1
+            self._size -= 1
+            self.mask &= ~(1 << (cell[0] * self._width + cell[1]))
     
     def mark_safe(self, cell):
         """
@@ -137,6 +191,29 @@ class Sentence():
         """
         if cell in self.cells:
             self.cells.remove(cell)
+            self._size -= 1
+            self.mask &= ~(1 << (cell[0] * self._width + cell[1]))
+
+    def mark_mines(self, cells):
+        """
+        Igual que mark_mine, pero para varias celdas a la vez.
+        """
+        overlap = self.cells.intersection(cells)
+        if overlap:
+            self.cells -= overlap
+            self.count -= len(overlap)
+            self._size -= len(overlap)
+            self.mask &= ~_mask(overlap, self._width)
+
+    def mark_safes(self, cells):
+        """
+        Igual que mark_safe, pero para varias celdas a la vez.
+        """
+        overlap = self.cells.intersection(cells)
+        if overlap:
+            self.cells -= overlap
+            self._size -= len(overlap)
+            self.mask &= ~_mask(overlap, self._width)
 
 
 class MinesweeperAI():
@@ -151,32 +228,134 @@ class MinesweeperAI():
         self.width = width
 
         # Lleva el registro de qué celdas han sido seleccionadas
-        self.moves_made = set()
+        self._moves_arr = bytearray(height * width)
 
         # Lleva el registro de celdas que se sabe que son seguras o minas
-        self.mines = set()
-        self.safes = set()
+        self._mines_arr = bytearray(height * width)
+        self._safes_arr = bytearray(height * width)
+
+        # Tabla de vecinos de cada celda, compartida por los tableros del mismo tamaño
+        self._neighbors = _neighbor_table(height, width)
 
-        # Lista de sentencias sobre el juego que se sabe que son verdaderas
+        # Lista de sentencias sobre el juego que se sabe que son verdaderas,
+        # y las claves de esas sentencias para descartar repetidas en O(1)
         self.knowledge = []
+        self._known_keys = set()
+
+        # Celdas que no han sido seleccionadas ni se sabe que son minas, junto
+        # con la posición de cada una en la lista para poder quitarlas en O(1)
+        self._available_list = [(i, j) for i in range(height) for j in range(width)]
+        self._available = {cell: k for k, cell in enumerate(self._available_list)}
+
+        # Celdas seguras que aún no han sido seleccionadas, con el mismo esquema
+        self._safe_moves_list = []
+        self._safe_moves = {}
+
+    @property
+    def moves_made(self):
+        """
+        Conjunto de celdas que han sido seleccionadas.
+        """
+        return self._cells_of(self._moves_arr)
+
+    @property
+    def mines(self):
+        """
+        Conjunto de celdas que se sabe que son minas.
+        """
+        return self._cells_of(self._mines_arr)
+
+    @property
+    def safes(self):
+        """
+        Conjunto de celdas que se sabe que son seguras.
+        """
+        return self._cells_of(self._safes_arr)
+
+    def _cells_of(self, arr):
+        """
+        Convierte un mapa de bits plano del tablero en un conjunto de celdas.
+        """
+        flat = np.flatnonzero(np.frombuffer(arr, dtype=np.uint8))
+        return {divmod(int(k), self.width) for k in flat}
 
     def mark_mine(self, cell):
         """
         Marca una celda como mina y actualiza todo el conocimiento
         para marcar esa celda también como mina.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.mark_mine_many((cell,))
 
     def mark_safe(self, cell):
         """
         Marca una celda como segura y actualiza todo el conocimiento
         para marcar esa celda también como segura.
         """
-        self.safes.add(cell)
+        self.mark_safe_many((cell,))
+
+    def mark_mine_many(self, cells):
+        """
+        Marca varias celdas como minas, recorriendo el conocimiento
+        una sola vez para todas ellas. Devuelve True si alguna sentencia cambió.
+        """
+        cells = set(cells)
+        for cell in cells:
+            self._mines_arr[cell[0] * self.width + cell[1]] = 1
+            _swap_remove(self._available_list, self._available, cell)
+        return self._update_knowledge(cells, Sentence.mark_mines)
+
+    def mark_safe_many(self, cells):
+        """
+        Marca varias celdas como seguras, recorriendo el conocimiento
+        una sola vez para todas ellas. Devuelve True si alguna sentencia cambió.
+        """
+        cells = set(cells)
+        for cell in cells:
+            k = cell[0] * self.width + cell[1]
+            if not self._safes_arr[k] and not self._moves_arr[k]:
+                self._safe_moves[cell] = len(self._safe_moves_list)
+                self._safe_moves_list.append(cell)
+            self._safes_arr[k] = 1
+        return self._update_knowledge(cells, Sentence.mark_safes)
+
+    def _update_knowledge(self, cells, mark):
+        """
+        Aplica `mark` con las celdas a las sentencias que contienen alguna,
+        actualizando sus claves y quitando las que quedan vacías o repetidas.
+        Devuelve True si alguna sentencia cambió.
+        """
+        bits = _mask(cells, self.width)
+        changed = False
+        removed = set()
         for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+            if not sentence.mask & bits:
+                continue
+            changed = True
+            self._known_keys.discard(sentence.key())
+            mark(sentence, cells)
+            key = sentence.key()
+            if not sentence.cells or key in self._known_keys:
+                removed.add(id(sentence))
+            else:
+                self._known_keys.add(key)
+        if removed:
+            self.knowledge = [s for s in self.knowledge if id(s) not in removed]
+        return changed
+
+    def _add_sentence(self, sentence):
+        """
+        Añade una sentencia a la base de conocimiento si no estaba ya.
+        Las sentencias vacías no aportan información y no se guardan.
+        Devuelve True si la sentencia se añadió.
+        """
+        if not sentence.cells:
+            return False
+        key = sentence.key()
+        if key in self._known_keys:
+            return False
+        self._known_keys.add(key)
+        self.knowledge.append(sentence)
+        return True
 
     def add_knowledge(self, cell, count):
         """
@@ -194,52 +373,101 @@ class MinesweeperAI():
                si se pueden inferir a partir del conocimiento existente
         """
         #1 
-        self.moves_made.add(cell)
+        self._moves_arr[cell[0] * self.width + cell[1]] = 1
+        _swap_remove(self._available_list, self._available, cell)
+        _swap_remove(self._safe_moves_list, self._safe_moves, cell)
 
         #2
-        self.mark_safe(cell)
+        changed = self.mark_safe_many((cell,))
 
         #3
-        cells=set()
-
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                if (i, j) == cell:
-                    continue
-
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                        cells.add((i, j))
-                    elif (i, j) in self.mines:
-                        count -= 1
-        self.knowledge.append(Sentence(cells, count))
-        
-        #4
+        mines_arr = self._mines_arr
+        safes_arr = self._safes_arr
+        cells = set()
+
+        for neighbor, k in self._neighbors[cell[0] * self.width + cell[1]]:
+            if mines_arr[k]:
+                count -= 1
+            elif not safes_arr[k]:
+                cells.add(neighbor)
+
+        # Una sentencia trivial se resuelve en el acto, sin guardarla,
+        # y una vacía o repetida no aporta nada
+        if cells:
+            if count == 0:
+                changed = self.mark_safe_many(cells) or changed
+            elif count == len(cells):
+                changed = self.mark_mine_many(cells) or changed
+            else:
+                changed = self._add_sentence(Sentence(cells, count, self.width)) or changed
+
+        # Los pasos 4 y 5 se repiten hasta que no se deduce nada nuevo, así cada
+        # jugada deja el conocimiento ya propagado y la base no crece de más.
+        # Si ninguna sentencia cambió, el conocimiento ya estaba propagado.
+        while changed:
+            #4
+            changed = self._mark_known()
+
+            #5
+            if self._infer_sentences():
+                changed = True
+
+    def _mark_known(self):
+        """
+        Marca como seguras o minas las celdas que se pueden concluir
+        a partir de alguna sentencia. Devuelve True si marcó alguna.
+        """
+        # Se reúnen primero las celdas a marcar y se marcan todas juntas después
+        # del recorrido, así cada sentencia se actualiza una sola vez
+        pending_safe = set()
+        pending_mine = set()
         for sentence in self.knowledge:
             safes = sentence.known_safes()
             if safes:
-                for cell in safes.copy():
-                    self.mark_safe(cell)
+                pending_safe.update(safes)
             mines = sentence.known_mines()
             if mines:
-                for cell in mines.copy():
-                    self.mark_mine(cell)
-        
-        #5
-        for sentence1 in self.knowledge:
-            for sentence2 in self.knowledge:
-                if sentence1 is sentence2:
+                pending_mine.update(mines)
+        if pending_safe:
+            self.mark_safe_many(pending_safe)
+        if pending_mine:
+            self.mark_mine_many(pending_mine)
+        return bool(pending_safe or pending_mine)
+
+    def _infer_sentences(self):
+        """
+        Añade las sentencias que se deducen de restar una sentencia a otra
+        que la contiene. Devuelve True si añadió alguna.
+        """
+        # Cada conjunto de celdas se representa como un entero usado de bitset:
+        # a es subconjunto de b si (a & b) == a.
+        # Se recorre una copia, así las sentencias nuevas no entran en este recorrido.
+        snap = list(self.knowledge)
+        masks = [sentence.mask for sentence in snap]
+
+        # Índice invertido celda -> posiciones de las sentencias que la contienen
+        by_cell = {}
+        for k, sentence in enumerate(snap):
+            for c in sentence.cells:
+                by_cell.setdefault(c, []).append(k)
+
+        added = False
+        for mask1, sentence1 in zip(masks, snap):
+            # Un superconjunto propio de sentence1 contiene todas sus celdas y
+            # tiene más, así que basta revisar las sentencias de su celda menos frecuente
+            size1 = sentence1.size
+            candidates = min((by_cell[c] for c in sentence1.cells), key=len)
+            for k in candidates:
+                sentence2 = snap[k]
+                mask2 = masks[k]
+                if sentence2.size <= size1 or mask1 & mask2 != mask1:
                     continue
-                if sentence1 == sentence2:
-                    self.knowledge.remove(sentence2)
-                elif sentence1.cells.issubset(sentence2.cells):
-                    new_knowledge = Sentence(
+                if self._add_sentence(Sentence(
                         sentence2.cells - sentence1.cells,
-                        sentence2.count - sentence1.count)
-                    if new_knowledge not in self.knowledge:
-                        self.knowledge.append(new_knowledge)
-
+                        sentence2.count - sentence1.count,
+                        self.width, mask2 & ~mask1)):
+                    added = True
+        return added
 
     def make_safe_move(self):
         """
@@ -250,9 +478,8 @@ class MinesweeperAI():
         Esta función puede usar el conocimiento en self.mines, self.safes
         y self.moves_made, pero no debe modificar ninguno de esos valores.
         """
-        available_steps = self.safes - self.moves_made
-        if available_steps:
-            return random.choice(tuple(available_steps))
+        if self._safe_moves_list:
+            return self._safe_moves_list[_rng.randrange(len(self._safe_moves_list))]
         return None
 
     def make_random_move(self):
@@ -262,12 +489,6 @@ class MinesweeperAI():
             1) no hayan sido seleccionadas, y
             2) no se sepa que son minas
         """
-        if len(self.mines) + len(self.moves_made) == self.height * self.width:
+        if not self._available_list:
             return None
-
-        # loop until an appropriate move is found
-        while True:
-            i = random.randrange(self.height)
-            j = random.randrange(self.width)
-            if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                return (i, j)
+        return self._available_list[_rng.randrange(len(self._available_list))]